@@ -0,0 +1,258 @@
+"""
+Metadata Cache
+Persistent on-disk cache for yt_dlp extract_info results, keyed by video ID.
+Shared by simple-youtube-scraper.py and youtube-scraper.py.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from youtube_urls import extract_video_id
+
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'youtube-scraper'
+DEFAULT_CACHE_PATH = DEFAULT_CACHE_DIR / 'meta.sqlite3'
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+
+# Seconds to wait for another process holding the database lock.
+BUSY_TIMEOUT = 10
+
+# Run through executescript: a plain execute() stops after freeing one page.
+_RECLAIM_SPACE = 'PRAGMA incremental_vacuum;'
+
+# Only what --list-formats shows is stored; a full YouTube info dict (captions,
+# thumbnails, ...) is often hundreds of KB.
+_INFO_FIELDS = ('title', 'duration')
+_FORMAT_FIELDS = ('format_id', 'ext', 'format_note', 'resolution', 'filesize')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS videos (
+    key TEXT PRIMARY KEY,
+    stored REAL NOT NULL,
+    accessed REAL NOT NULL,
+    info TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_accessed ON videos (accessed);
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+def summarize_info(info):
+    """
+    Reduce a yt_dlp info dict to the fields kept in the cache.
+
+    Args:
+        info (dict): Info dict from yt_dlp
+
+    Returns:
+        dict: Title, duration and per-format ID, extension, note, resolution and size
+    """
+    summary = {field: info[field] for field in _INFO_FIELDS if field in info}
+    summary['formats'] = [
+        {field: fmt[field] for field in _FORMAT_FIELDS if field in fmt}
+        for fmt in info.get('formats') or []
+    ]
+    return summary
+
+
+def open_cache(path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Open the metadata cache, or warn and return None if it is unavailable.
+
+    Args:
+        path (str): Path of the SQLite database
+        ttl (int): Seconds an entry stays valid
+        max_entries (int): Maximum number of entries kept on disk
+
+    Returns:
+        MetadataCache: Open cache, or None if it could not be opened
+    """
+    try:
+        return MetadataCache(path, ttl, max_entries)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Metadata cache unavailable, continuing without it: {str(e)}", file=sys.stderr)
+        return None
+
+
+class MetadataCache:
+    """
+    SQLite-backed cache of video metadata with a TTL and an entry cap.
+
+    Entries older than the TTL are treated as misses. When the number of
+    entries exceeds the cap, the least recently used ones are evicted and
+    their pages returned to the filesystem. Several processes can share the
+    database; within a process, a lock lets worker threads share one
+    connection. The cache is best-effort: database errors after opening
+    are reported once and otherwise behave like misses.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path (str): Path of the SQLite database
+            ttl (int): Seconds an entry stays valid
+            max_entries (int): Maximum number of entries kept on disk
+
+        Raises:
+            OSError: If the cache directory cannot be created
+            sqlite3.Error: If the database cannot be opened
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._warned = False
+        self._db = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        try:
+            # auto_vacuum only takes effect before the first table is created.
+            self._db.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self._db.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self._db.close()
+            raise
+
+    @staticmethod
+    def key_for(url):
+        """Return the cache key for a URL (its video ID, or the URL itself)."""
+        return extract_video_id(url) or url
+
+    def _report(self, error):
+        """Print the first database error seen; later ones are silent."""
+        if not self._warned:
+            self._warned = True
+            print(f"Warning: Metadata cache error, continuing without it: {str(error)}", file=sys.stderr)
+
+    def get(self, url):
+        """
+        Look up cached metadata for a URL.
+
+        Args:
+            url (str): YouTube video URL
+
+        Returns:
+            dict: Cached info dict, or None on a miss or expired entry
+        """
+        key = self.key_for(url)
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._db.execute('SELECT stored, info FROM videos WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                if now - row[0] > self.ttl:
+                    self._db.execute('DELETE FROM videos WHERE key = ?', (key,))
+                    return None
+                self._db.execute('UPDATE videos SET accessed = ? WHERE key = ?', (now, key))
+                return json.loads(row[1])
+            except sqlite3.Error as e:
+                self._report(e)
+                return None
+
+    def put(self, url, info):
+        """
+        Store metadata for a URL.
+
+        Only the summary from summarize_info is kept, so cached entries
+        stay small.
+
+        Args:
+            url (str): YouTube video URL
+            info (dict): Info dict from yt_dlp
+        """
+        key = self.key_for(url)
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO videos (key, stored, accessed, info) VALUES (?, ?, ?, ?)',
+                    (key, now, now, json.dumps(summarize_info(info)))
+                )
+                count = self._db.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
+                if count > self.max_entries:
+                    self._evict(count)
+            except sqlite3.Error as e:
+                self._report(e)
+
+    def get_setting(self, name):
+        """
+        Look up a persisted setting (e.g. a tuned worker count).
+
+        Settings do not expire and are not counted against the entry cap.
+
+        Args:
+            name (str): Setting name
+
+        Returns:
+            object: Stored value, or None if unset
+        """
+        with self._lock:
+            try:
+                row = self._db.execute('SELECT value FROM settings WHERE name = ?', (name,)).fetchone()
+            except sqlite3.Error as e:
+                self._report(e)
+                return None
+        return json.loads(row[0]) if row else None
+
+    def put_setting(self, name, value):
+        """
+        Persist a setting across runs.
+
+        Args:
+            name (str): Setting name
+            value (object): JSON-serializable value
+        """
+        with self._lock:
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)',
+                    (name, json.dumps(value))
+                )
+            except sqlite3.Error as e:
+                self._report(e)
+
+    def _evict(self, count):
+        """Drop least recently used entries down to 90% of the cap and reclaim their space."""
+        target = max(int(self.max_entries * 0.9), 0)
+        self._db.execute(
+            'DELETE FROM videos WHERE key IN (SELECT key FROM videos ORDER BY accessed LIMIT ?)',
+            (count - target,)
+        )
+        self._db.executescript(_RECLAIM_SPACE)
+
+    def clear(self):
+        """
+        Remove every entry and setting from the cache.
+
+        Returns:
+            bool: True if the cache was cleared
+        """
+        with self._lock:
+            try:
+                self._db.execute('DELETE FROM videos')
+                self._db.execute('DELETE FROM settings')
+                self._db.executescript(_RECLAIM_SPACE)
+            except sqlite3.Error as e:
+                self._report(e)
+                return False
+        return True
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -7,10 +7,42 @@ import os
 import sys
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from yt_dlp import YoutubeDL
+from metadata_cache import open_cache, DEFAULT_MAX_ENTRIES
+from youtube_urls import is_youtube_url
 
+# Parallel fragment downloads per video, and the HTTP chunk size used to split
+# non-fragmented formats into ranged requests.
+DEFAULT_FRAGMENTS = 8
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024
 
-def download_video(url, output_path="./downloads", quality="best", audio_only=False):
+# Upper bound on parallel metadata fetches for --list-formats.
+MAX_LIST_WORKERS = 16
+
+# Output filename template, joined with the output directory.
+OUTPUT_TEMPLATE = '%(title)s.%(ext)s'
+
+# Option templates copied by download_video, which fills in the per-call
+# fields; these must not be mutated.
+_AUDIO_POSTPROCESSORS = [{
+    'key': 'FFmpegExtractAudio',
+    'preferredcodec': 'mp3',
+    'preferredquality': '192',
+}]
+
+_VIDEO_OPTS_TEMPLATE = {
+    'http_chunk_size': HTTP_CHUNK_SIZE,
+}
+
+_AUDIO_OPTS_TEMPLATE = {
+    'http_chunk_size': HTTP_CHUNK_SIZE,
+    'format': 'bestaudio/best',
+    'postprocessors': _AUDIO_POSTPROCESSORS,
+}
+
+
+def download_video(url, output_path="./downloads", quality="best", audio_only=False, cache=None, fragments=DEFAULT_FRAGMENTS):
     """
     Download a YouTube video using yt_dlp.
     
@@ -19,37 +51,35 @@ def download_video(url, output_path="./downloads", quality="best", audio_only=Fa
         output_path (str): Directory to save the downloaded file
         quality (str): Video quality preference ('best', 'worst', '720p', '480p', etc.)
         audio_only (bool): If True, download only audio
+        cache (MetadataCache): Optional cache to record the video's metadata in
+        fragments (int): Number of fragments of a DASH/HLS video to download in parallel
     """
     
     Path(output_path).mkdir(parents=True, exist_ok=True)
     
-    ydl_opts = {
-        'outtmpl': os.path.join(output_path, '%(title)s.%(ext)s'),
-        'format': 'bestaudio/best' if audio_only else f'{quality}[ext=mp4]/best[ext=mp4]/best',
-    }
-    
-    if audio_only:
-        ydl_opts.update({
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-        })
+    ydl_opts = _AUDIO_OPTS_TEMPLATE.copy() if audio_only else _VIDEO_OPTS_TEMPLATE.copy()
+    ydl_opts['outtmpl'] = os.path.join(output_path, OUTPUT_TEMPLATE)
+    ydl_opts['concurrent_fragment_downloads'] = fragments
+    if not audio_only:
+        ydl_opts['format'] = f'{quality}[ext=mp4]/best[ext=mp4]/best'
     
     try:
         with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+            print(f"Downloading to: {output_path}")
+            print("-" * 50)
+            
+            # A single extract_info call both resolves metadata and downloads,
+            # avoiding a second webpage fetch and player decode.
+            info = ydl.extract_info(url, download=True)
             title = info.get('title', 'Unknown')
-            duration = info.get('duration', 0)
+            duration = info.get('duration') or 0
             
+            if cache is not None:
+                cache.put(url, info)
+            
+            print("-" * 50)
             print(f"Title: {title}")
             print(f"Duration: {duration // 60}:{duration % 60:02d}")
-            print(f"Downloading to: {output_path}")
-            print("-" * 50)
-            
-            ydl.download([url])
             print("Download completed successfully!")
             
     except Exception as e:
@@ -59,6 +89,129 @@ def download_video(url, output_path="./downloads", quality="best", audio_only=Fa
     return True
 
 
+def format_table(info):
+    """
+    Build the format table for a video's metadata.
+    
+    Args:
+        info (dict): Info dict from yt_dlp
+    
+    Returns:
+        str: Table of available formats, ready to print
+    """
+    
+    formats = info.get('formats', [])
+    
+    lines = [
+        f"Available formats for: {info.get('title', 'Unknown')}",
+        "-" * 80,
+        f"{'Format ID':<12} {'Extension':<10} {'Quality':<15} {'Size':<10}",
+        "-" * 80,
+    ]
+    
+    for fmt in formats:
+        format_id = fmt.get('format_id', 'N/A')
+        ext = fmt.get('ext', 'N/A')
+        quality = fmt.get('format_note', fmt.get('resolution', 'N/A'))
+        filesize = fmt.get('filesize')
+        size_str = f"{filesize // (1024*1024)}MB" if filesize else "Unknown"
+        
+        lines.append(f"{format_id:<12} {ext:<10} {quality:<15} {size_str:<10}")
+    
+    return "\n".join(lines)
+
+
+def _report_list_error(url, error):
+    """Print an error for one URL of a format listing."""
+    print(f"Error listing formats for {url}: {str(error)}")
+    print()
+
+
+def _show_formats(url, info):
+    """
+    Print the format table for one video.
+    
+    A malformed info dict is reported for this URL only, so the remaining
+    URLs are still listed.
+    
+    Args:
+        url (str): YouTube video URL
+        info (dict): Info dict from yt_dlp or the metadata cache
+    
+    Returns:
+        bool: True if the formats were printed
+    """
+    
+    try:
+        table = format_table(info)
+    except Exception as e:
+        _report_list_error(url, e)
+        return False
+    
+    print(table)
+    print()
+    return True
+
+
+def list_formats(urls, cache, refresh=False):
+    """
+    Print the available formats for one or more videos.
+    
+    Cached metadata is printed straight away; the remaining videos are
+    fetched in parallel with a shared YoutubeDL and printed as each one
+    completes.
+    
+    Args:
+        urls (list): YouTube video URLs
+        cache (MetadataCache): Metadata cache to read from and populate, or None
+        refresh (bool): If True, bypass the cache and fetch fresh metadata
+    
+    Returns:
+        bool: True if formats were listed for every URL
+    """
+    
+    success = True
+    misses = []
+    
+    for url in urls:
+        info = None if refresh or cache is None else cache.get(url)
+        if info is None:
+            misses.append(url)
+        elif not _show_formats(url, info):
+            success = False
+    
+    if not misses:
+        return success
+    
+    try:
+        ydl = YoutubeDL({'quiet': True})
+    except Exception as e:
+        print(f"Error listing formats: {str(e)}")
+        return False
+    
+    with ydl, ThreadPoolExecutor(max_workers=min(len(misses), MAX_LIST_WORKERS)) as executor:
+        future_to_url = {
+            executor.submit(ydl.extract_info, url, download=False): url
+            for url in misses
+        }
+        
+        for future in as_completed(future_to_url):
+            url = future_to_url[future]
+            try:
+                info = future.result()
+                if cache is not None:
+                    cache.put(url, info)
+            except Exception as e:
+                _report_list_error(url, e)
+                success = False
+                continue
+            
+            if not _show_formats(url, info):
+                success = False
+    
+    return success
+
+
 def main():
     """Main function to handle command line arguments and execute download."""
     
@@ -71,12 +224,15 @@ Examples:
   python simple-youtube-scraper.py "https://www.youtube.com/watch?v=VIDEO_ID" --quality 720p
   python simple-youtube-scraper.py "https://www.youtube.com/watch?v=VIDEO_ID" --audio-only
   python simple-youtube-scraper.py "https://www.youtube.com/watch?v=VIDEO_ID" --output ./my_videos
+  python simple-youtube-scraper.py "https://youtu.be/VIDEO_ID_1" "https://youtu.be/VIDEO_ID_2" --list-formats
         """
     )
     
     parser.add_argument(
-        'url',
-        help='YouTube video URL to download'
+        'urls',
+        nargs='+',
+        metavar='url',
+        help='YouTube video URL to download (several may be given with --list-formats)'
     )
     
     parser.add_argument(
@@ -97,50 +253,72 @@ Examples:
         help='Download only audio (MP3 format)'
     )
     
+    parser.add_argument(
+        '--fragments', '-f',
+        type=int,
+        default=DEFAULT_FRAGMENTS,
+        help=f'Number of video fragments to download in parallel (default: {DEFAULT_FRAGMENTS})'
+    )
+    
     parser.add_argument(
         '--list-formats',
         action='store_true',
-        help='List available formats for the video without downloading'
+        help='List available formats for the video(s) without downloading'
+    )
+    
+    parser.add_argument(
+        '--refresh-metadata',
+        action='store_true',
+        help='Ignore cached metadata and fetch it again from YouTube'
+    )
+    
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Clear the metadata cache before running'
+    )
+    
+    parser.add_argument(
+        '--metadata-cache-size',
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f'Maximum number of videos kept in the metadata cache (default: {DEFAULT_MAX_ENTRIES})'
     )
     
     args = parser.parse_args()
 
-    if not args.url.startswith(('https://www.youtube.com/', 'https://youtu.be/', 'https://youtube.com/')):
-        print("Error: Please provide a valid YouTube URL")
+    for url in args.urls:
+        if not is_youtube_url(url):
+            print(f"Error: Please provide a valid YouTube URL: {url}")
+            sys.exit(1)
+    
+    if len(args.urls) > 1 and not args.list_formats:
+        print("Error: Only one URL can be downloaded at a time; use youtube-scraper.py for batches")
         sys.exit(1)
     
-    if args.list_formats:
-        try:
-            with YoutubeDL({'quiet': True}) as ydl:
-                info = ydl.extract_info(args.url, download=False)
-                formats = info.get('formats', [])
-                
-                print(f"Available formats for: {info.get('title', 'Unknown')}")
-                print("-" * 80)
-                print(f"{'Format ID':<12} {'Extension':<10} {'Quality':<15} {'Size':<10}")
-                print("-" * 80)
-                
-                for fmt in formats:
-                    format_id = fmt.get('format_id', 'N/A')
-                    ext = fmt.get('ext', 'N/A')
-                    quality = fmt.get('format_note', fmt.get('resolution', 'N/A'))
-                    filesize = fmt.get('filesize')
-                    size_str = f"{filesize // (1024*1024)}MB" if filesize else "Unknown"
-                    
-                    print(f"{format_id:<12} {ext:<10} {quality:<15} {size_str:<10}")
-                    
-        except Exception as e:
-            print(f"Error listing formats: {str(e)}")
-            sys.exit(1)
-        
-        return
+    if args.fragments < 1:
+        print("Error: --fragments must be at least 1")
+        sys.exit(1)
     
-    success = download_video(
-        url=args.url,
-        output_path=args.output,
-        quality=args.quality,
-        audio_only=args.audio_only
-    )
+    cache = open_cache(max_entries=args.metadata_cache_size)
+    try:
+        if args.clear_cache and cache is not None and cache.clear():
+            print("Metadata cache cleared.")
+        
+        if args.list_formats:
+            success = list_formats(args.urls, cache, refresh=args.refresh_metadata)
+        else:
+            success = download_video(
+                url=args.urls[0],
+                output_path=args.output,
+                quality=args.quality,
+                audio_only=args.audio_only,
+                cache=cache,
+                fragments=args.fragments
+            )
+    finally:
+        if cache is not None:
+            cache.close()
     
     if not success:
         sys.exit(1)
@@ -1,159 +1,550 @@
 """
 YouTube Video Scraper Script
 Downloads multiple YouTube videos concurrently from a text file containing URLs.
-Uses yt_dlp with ThreadPoolExecutor for concurrent downloads with 10 workers.
+Uses yt_dlp with asyncio for concurrent downloads with 4 workers.
 """
 
 import os
 import sys
+import asyncio
 import argparse
+import functools
+import itertools
+import logging
+import logging.handlers
 import threading
+import time
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import SimpleQueue
+from concurrent.futures import ThreadPoolExecutor
 from yt_dlp import YoutubeDL
+from metadata_cache import open_cache, DEFAULT_MAX_ENTRIES
+from youtube_urls import is_youtube_url, extract_video_id
 
+logger = logging.getLogger("dl")
 
-def download_video(url, output_path="./downloads", quality="best", audio_only=False, worker_id=None):
+# Invalid/duplicate line warnings are buffered and written in batches of this size.
+WARNING_BUFFER_SIZE = 1000
+
+# Fraction of duplicate URLs in the input above which an extra warning is shown.
+DUPLICATE_WARN_RATIO = 0.10
+
+# Worker counts probed by --workers auto, and the minimum throughput gain
+# needed to keep doubling before settling on the previous count. Steps whose
+# workers * fragments would exceed AUTO_MAX_REQUESTS in-flight requests are
+# skipped (8 workers with the default 8 fragments).
+AUTO_WORKER_STEPS = (2, 4, 8, 16)
+AUTO_MIN_GAIN = 0.15
+AUTO_MAX_REQUESTS = 64
+
+# A tuning round only counts as a measurement if at least this fraction of
+# its downloads succeeded; failed downloads move no bytes and say nothing
+# about throughput.
+AUTO_MIN_SUCCESS = 0.5
+
+# Each worker downloads up to DEFAULT_FRAGMENTS fragments of its video in
+# parallel, so in-flight requests are roughly workers * fragments. The worker
+# default is kept low so the product stays moderate and YouTube does not start
+# timing out requests.
+DEFAULT_WORKERS = 4
+DEFAULT_FRAGMENTS = 8
+HTTP_CHUNK_SIZE = 10 * 1024 * 1024
+
+# Metadata extraction is a small, latency-bound request, so it runs with far
+# more concurrency than the bandwidth-bound downloads it feeds.
+METADATA_WORKERS = 32
+
+# Each pipeline queue holds at most this many items per worker consuming it,
+# so the work in flight is O(workers) no matter how many URLs are in the file.
+QUEUE_DEPTH_PER_WORKER = 2
+
+# Output filename template; joined with the output directory once per batch.
+OUTPUT_TEMPLATE = '%(title)s.%(ext)s'
+
+# Option templates shared by every batch; build_ydl_opts copies one and fills
+# in the per-batch fields, so these must not be mutated.
+_AUDIO_POSTPROCESSORS = [{
+    'key': 'FFmpegExtractAudio',
+    'preferredcodec': 'mp3',
+    'preferredquality': '192',
+}]
+
+_VIDEO_OPTS_TEMPLATE = {
+    'quiet': True,
+    'http_chunk_size': HTTP_CHUNK_SIZE,
+}
+
+_AUDIO_OPTS_TEMPLATE = {
+    'quiet': True,
+    'http_chunk_size': HTTP_CHUNK_SIZE,
+    'format': 'bestaudio/best',
+    'postprocessors': _AUDIO_POSTPROCESSORS,
+}
+
+
+def build_ydl_opts(output_path="./downloads", quality="best", audio_only=False, fragments=DEFAULT_FRAGMENTS):
     """
-    Download a YouTube video using yt_dlp.
+    Build the yt_dlp options for a download configuration.
     
     Args:
-        url (str): YouTube video URL
         output_path (str): Directory to save the downloaded file
         quality (str): Video quality preference ('best', 'worst', '720p', '480p', etc.)
         audio_only (bool): If True, download only audio
-        worker_id (int): Worker thread ID for logging
+        fragments (int): Number of fragments of a DASH/HLS video to download in parallel
     
     Returns:
-        tuple: (url, success, error_message)
+        dict: Options suitable for YoutubeDL
     """
     
-    Path(output_path).mkdir(parents=True, exist_ok=True)
+    ydl_opts = _AUDIO_OPTS_TEMPLATE.copy() if audio_only else _VIDEO_OPTS_TEMPLATE.copy()
+    ydl_opts['outtmpl'] = os.path.join(output_path, OUTPUT_TEMPLATE)
+    ydl_opts['concurrent_fragment_downloads'] = fragments
+    if not audio_only:
+        ydl_opts['format'] = f'{quality}[ext=mp4]/best[ext=mp4]/best'
     
-    ydl_opts = {
-        'outtmpl': os.path.join(output_path, '%(title)s.%(ext)s'),
-        'format': 'bestaudio/best' if audio_only else f'{quality}[ext=mp4]/best[ext=mp4]/best',
-        'quiet': True,
-    }
-    
-    if audio_only:
-        ydl_opts.update({
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-        })
+    return ydl_opts
+
+
+def download_video(url, ydl, ie_result, worker_id=None, cache=None):
+    """
+    Download a YouTube video from already extracted metadata.
+    
+    Args:
+        url (str): YouTube video URL
+        ydl (YoutubeDL): YoutubeDL instance shared across worker threads
+        ie_result (dict): Unprocessed extractor result for the URL from
+            extract_info(process=False), so the page is not extracted again
+        worker_id (int): Worker thread ID for logging
+        cache (MetadataCache): Optional cache to record the video's metadata in;
+            this script only writes it, for simple-youtube-scraper.py --list-formats
+    
+    Returns:
+        tuple: (url, success, error_message)
+    """
     
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            title = info.get('title', 'Unknown')
-            duration = info.get('duration', 0)
-            
-            worker_info = f"[Worker {worker_id}]" if worker_id else "[Main]"
-            print(f"{worker_info} Starting download: {title}")
-            print(f"{worker_info} Duration: {duration // 60}:{duration % 60:02d}")
-            
-            ydl.download([url])
-            print(f"{worker_info} [OK] Completed: {title}")
-            
-            return (url, True, None)
-            
+        logger.info("[Worker %s] Starting download: %s", worker_id, url)
+        
+        info = ydl.process_ie_result(ie_result, download=True)
+        title = info.get('title', 'Unknown')
+        duration = info.get('duration') or 0
+        
+        if cache is not None:
+            cache.put(url, info)
+        
+        logger.info("[Worker %s] [OK] Completed: %s (%d:%02d)", worker_id, title, duration // 60, duration % 60)
+        
+        return (url, True, None)
+        
     except Exception as e:
         error_msg = str(e)
-        worker_info = f"[Worker {worker_id}]" if worker_id else "[Main]"
-        print(f"{worker_info} [FAIL] Failed: {url} - {error_msg}")
+        logger.error("[Worker %s] [FAIL] Failed: %s - %s", worker_id, url, error_msg)
         return (url, False, error_msg)
 
 
-def read_urls_from_file(file_path):
+def _flush_warnings(warnings):
+    """Write buffered parser warnings to stderr in one call and empty the buffer."""
+    if warnings:
+        sys.stderr.write('\n'.join(warnings) + '\n')
+        warnings.clear()
+
+
+class UrlFileReader:
+    """
+    Stream YouTube URLs from a text file, yielding each one as it is parsed.
+    
+    Iteration yields valid URLs, deduplicated by video ID in file order. If
+    the file cannot be read, iteration simply ends and the exception is kept
+    in `error`, so a running pipeline stops being fed and drains instead of
+    aborting; the caller reports the error alongside the results so far.
+    Warnings about skipped lines are buffered and written in batches;
+    duplicates are only counted, for the caller to include in its summary.
     """
-    Read YouTube URLs from a text file.
     
-    Args:
-        file_path (str): Path to the text file containing URLs
+    def __init__(self, file_path):
+        """
+        Args:
+            file_path (str): Path to the text file containing URLs
+        """
+        self.file_path = file_path
+        self.error = None
+        self.unique = 0
+        self.duplicates = 0
+        self._pending = []
+        self._warnings = []
+        self._lines = self._read()
+    
+    def _read(self):
+        """Parse the file, raising any error encountered while reading it."""
+        seen_ids = set()
+        warnings = self._warnings
+        
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                for line_num, line in enumerate(file, 1):
+                    if len(warnings) >= WARNING_BUFFER_SIZE:
+                        _flush_warnings(warnings)
+                    
+                    line = line.strip()
+                    
+                    if not line or line.startswith('#'):
+                        continue
+                    
+                    if not is_youtube_url(line):
+                        warnings.append(f"Warning: Line {line_num} is not a valid YouTube URL: {line}")
+                        continue
+                    
+                    video_id = extract_video_id(line)
+                    if video_id is None:
+                        warnings.append(f"Warning: Line {line_num} does not contain a valid video ID: {line}")
+                    elif video_id in seen_ids:
+                        self.duplicates += 1
+                        warnings.append(f"Warning: Line {line_num} contains duplicate URL (skipped): {line}")
+                    else:
+                        seen_ids.add(video_id)
+                        self.unique += 1
+                        yield line
+        finally:
+            _flush_warnings(warnings)
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        if self._pending:
+            return self._pending.pop()
+        if self.error is not None:
+            raise StopIteration
+        try:
+            return next(self._lines)
+        except StopIteration:
+            raise
+        except Exception as e:
+            self.error = e
+            raise StopIteration
+    
+    def flush_warnings(self):
+        """Write out any buffered warnings, e.g. before waiting on a full queue."""
+        _flush_warnings(self._warnings)
+    
+    def peek(self):
+        """Return the next URL without consuming it, or None at the end of the file."""
+        if not self._pending:
+            url = next(self, None)
+            if url is None:
+                return None
+            self._pending.append(url)
+        return self._pending[0]
+    
+    def report_duplicates(self):
+        """Print how many duplicate URLs were skipped, warning if there were many."""
+        if not self.duplicates:
+            return
+        print(f"Duplicate URLs skipped: {self.duplicates}")
+        if self.duplicates > DUPLICATE_WARN_RATIO * (self.unique + self.duplicates):
+            print(f"Warning: more than {DUPLICATE_WARN_RATIO:.0%} of the URLs in '{self.file_path}' are duplicates")
+    
+    def report_error(self):
+        """Print the read error, if any, in the script's usual format."""
+        if isinstance(self.error, FileNotFoundError):
+            print(f"Error: File '{self.file_path}' not found.")
+        elif self.error is not None:
+            print(f"Error reading file: {str(self.error)}")
+
+
+class ByteCounter:
+    """
+    yt_dlp progress hook that totals the bytes of finished downloads.
     
-    Returns:
-        list: List of valid YouTube URLs (deduplicated)
+    Hooks fire from worker threads, so updates are guarded by a lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+    
+    def __call__(self, d):
+        if d.get('status') == 'finished':
+            with self._lock:
+                self.total += d.get('downloaded_bytes') or d.get('total_bytes') or 0
+    
+    def reset(self):
+        with self._lock:
+            self.total = 0
+
+
+def _produce_urls(urls, queue, loop, num_workers, errors, flush_warnings=None):
+    """
+    Feed URLs into the bounded queue from a separate thread.
+    
+    Blocks while the queue is full, so only about
+    QUEUE_DEPTH_PER_WORKER * num_workers URLs are read ahead of the workers
+    consuming them. Before blocking, flush_warnings (if given) is called so
+    warnings buffered by the reader are not held back while it waits. A
+    None sentinel per worker is always queued at the end, and any error
+    raised while reading is recorded in errors for the event loop to
+    re-raise.
     """
-    urls = []
-    seen_urls = set()
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line_num, line in enumerate(file, 1):
-                line = line.strip()
-                
-                if not line or line.startswith('#'):
-                    continue
-                
-                if line.startswith(('https://www.youtube.com/', 'https://youtu.be/', 'https://youtube.com/')):
-                    if line not in seen_urls:
-                        urls.append(line)
-                        seen_urls.add(line)
-                    else:
-                        print(f"Warning: Line {line_num} contains duplicate URL (skipped): {line}")
-                else:
-                    print(f"Warning: Line {line_num} is not a valid YouTube URL: {line}")
+        for url in urls:
+            if flush_warnings is not None and queue.full():
+                flush_warnings()
+            asyncio.run_coroutine_threadsafe(queue.put(url), loop).result()
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        for _ in range(num_workers):
+            asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
+
+
+async def _metadata_worker(url_queue, info_queue, ydl, executor, results):
+    """
+    Extract metadata for URLs off url_queue and pass it on to info_queue.
     
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error reading file: {str(e)}")
-        sys.exit(1)
+    URLs whose extraction fails are recorded in results directly and never
+    reach a download worker. Stops when a None sentinel arrives.
+    """
+    
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        url = await url_queue.get()
+        if url is None:
+            return
+        try:
+            ie_result = await loop.run_in_executor(
+                executor,
+                functools.partial(ydl.extract_info, url, download=False, process=False)
+            )
+        except Exception as e:
+            logger.error("[Metadata] [FAIL] Failed: %s - %s", url, e)
+            results.append((url, False, str(e)))
+            continue
+        await info_queue.put((url, ie_result))
+
+
+async def _download_worker(info_queue, ydl, worker_id, cache, executor, results):
+    """Download videos from extracted metadata until a None sentinel arrives."""
+    
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        item = await info_queue.get()
+        if item is None:
+            return
+        url, ie_result = item
+        results.append(await loop.run_in_executor(
+            executor,
+            functools.partial(download_video, url, ydl, ie_result, worker_id=worker_id, cache=cache)
+        ))
+
+
+async def _download_all(urls, ydl, max_workers, cache, flush_warnings=None):
+    """
+    Run the URLs through a two-stage metadata/download pipeline.
+    
+    Metadata extraction is latency-bound and cheap, so METADATA_WORKERS
+    workers run it in their own thread pool; downloads are bandwidth-bound
+    and get max_workers workers. The stages are joined by a bounded queue,
+    so extraction runs only a little ahead of the downloads. Workers are
+    long-lived and pull from the queues, so no per-URL task or future is
+    created and work in flight stays proportional to the worker counts. A producer
+    thread pulls from the urls iterable, so work starts as soon as the
+    first URL is parsed; flush_warnings is passed on to it. Both stages
+    share the same YoutubeDL.
+    
+    Returns:
+        list: (url, success, error_message) tuples in completion order
+    """
     
-    return urls
+    loop = asyncio.get_running_loop()
+    url_queue = asyncio.Queue(maxsize=METADATA_WORKERS * QUEUE_DEPTH_PER_WORKER)
+    info_queue = asyncio.Queue(maxsize=max_workers * QUEUE_DEPTH_PER_WORKER)
+    results = []
+    errors = []
+    
+    producer = threading.Thread(
+        target=_produce_urls,
+        args=(urls, url_queue, loop, METADATA_WORKERS, errors, flush_warnings),
+        daemon=True
+    )
+    producer.start()
+    
+    async def metadata_stage(executor):
+        await asyncio.gather(*[
+            _metadata_worker(url_queue, info_queue, ydl, executor, results)
+            for _ in range(METADATA_WORKERS)
+        ])
+        for _ in range(max_workers):
+            await info_queue.put(None)
+    
+    with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as meta_executor, \
+            ThreadPoolExecutor(max_workers=max_workers) as download_executor:
+        await asyncio.gather(
+            metadata_stage(meta_executor),
+            *[
+                _download_worker(info_queue, ydl, worker_id, cache, download_executor, results)
+                for worker_id in range(1, max_workers + 1)
+            ]
+        )
+    
+    producer.join()
+    if errors:
+        raise errors[0]
+    
+    return results
+
+
+def _tuned_workers_key(fragments):
+    """Return the settings key for the worker count tuned at a fragment count."""
+    return f'workers:{fragments}'
 
 
-def download_concurrently(urls, output_path="./downloads", quality="best", audio_only=False, max_workers=10):
+async def _autotune_and_download(urls, ydl, cache, byte_counter, fragments, flush_warnings=None):
+    """
+    Pick a worker count by measuring throughput, then download the rest.
+    
+    The leading URLs are downloaded in rounds of AUTO_WORKER_STEPS workers
+    each, leaving out steps that would put more than AUTO_MAX_REQUESTS
+    requests in flight at this fragment count. Doubling stops once throughput improves by less than AUTO_MIN_GAIN,
+    and the best count so far is used for the remaining URLs. A round that
+    moves no bytes or has too many failures ends tuning without a result;
+    only a count chosen from real measurements is persisted in the metadata
+    cache for later runs, keyed on the fragment count.
+    
+    Returns:
+        list: (url, success, error_message) tuples in completion order
     """
-    Download multiple videos concurrently using ThreadPoolExecutor.
+    
+    steps = [w for w in AUTO_WORKER_STEPS if w * fragments <= AUTO_MAX_REQUESTS] or AUTO_WORKER_STEPS[:1]
+    urls = iter(urls)
+    results = []
+    best_workers, best_rate = steps[0], 0.0
+    settled = False
+    
+    for workers in steps:
+        batch = list(itertools.islice(urls, workers))
+        if len(batch) < workers:
+            urls = itertools.chain(batch, urls)
+            break
+        
+        byte_counter.reset()
+        start = time.monotonic()
+        round_results = await _download_all(batch, ydl, workers, cache, flush_warnings)
+        elapsed = time.monotonic() - start
+        results.extend(round_results)
+        
+        succeeded = sum(1 for _, success, _ in round_results if success)
+        if byte_counter.total == 0 or succeeded < workers * AUTO_MIN_SUCCESS:
+            logger.warning("[Auto] %d workers: only %d/%d downloads succeeded, stopping tuning", workers, succeeded, workers)
+            break
+        
+        rate = byte_counter.total / max(elapsed, 1e-6)
+        logger.info("[Auto] %d workers: %.2f MB/s", workers, rate / (1024 * 1024))
+        
+        if best_rate and rate < best_rate * (1 + AUTO_MIN_GAIN):
+            settled = True
+            break
+        best_workers, best_rate = workers, rate
+    else:
+        settled = True
+    
+    logger.info("[Auto] Using %d workers", best_workers)
+    if settled and best_rate and cache is not None:
+        cache.put_setting(_tuned_workers_key(fragments), best_workers)
+    
+    results.extend(await _download_all(urls, ydl, best_workers, cache, flush_warnings))
+    return results
+
+
+def download_concurrently(urls, output_path="./downloads", quality="best", audio_only=False, max_workers=DEFAULT_WORKERS, cache=None, fragments=DEFAULT_FRAGMENTS, retune=False):
+    """
+    Download multiple videos concurrently using asyncio.
     
     Args:
-        urls (list): List of YouTube URLs to download
+        urls (iterable): YouTube URLs to download, consumed as downloads proceed;
+            a UrlFileReader's buffered warnings are flushed whenever reading waits
         output_path (str): Directory to save downloaded files
         quality (str): Video quality preference
         audio_only (bool): If True, download only audio
-        max_workers (int): Maximum number of concurrent workers
+        max_workers (int or str): Maximum number of concurrent workers, or 'auto'
+            to pick one from measured throughput
+        cache (MetadataCache): Optional cache to record downloaded videos' metadata in
+        fragments (int): Number of fragments per video to download in parallel
+        retune (bool): If True, ignore a saved worker count and tune again
     
     Returns:
         tuple: (successful_downloads, failed_downloads)
     """
     
-    print(f"Starting concurrent download of {len(urls)} videos with {max_workers} workers...")
+    tuned_workers = None
+    if max_workers == 'auto' and cache is not None and not retune:
+        tuned_workers = cache.get_setting(_tuned_workers_key(fragments))
+    if tuned_workers:
+        max_workers = tuned_workers
+        print(f"[Auto] Reusing tuned worker count: {max_workers} (use --retune to measure again)")
+    
+    if max_workers == 'auto':
+        print("Starting concurrent download, auto-tuning workers...")
+    else:
+        print(f"Starting concurrent download with {max_workers} workers...")
     print(f"Output directory: {output_path}")
     print("-" * 60)
     
+    Path(output_path).mkdir(parents=True, exist_ok=True)
+    
     successful_downloads = []
     failed_downloads = []
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = {}
-        for i, url in enumerate(urls):
-            future = executor.submit(
-                download_video, 
-                url, 
-                output_path, 
-                quality, 
-                audio_only, 
-                worker_id=i+1
-            )
-            future_to_url[future] = url
-        
-        for future in as_completed(future_to_url):
-            url, success, error_msg = future.result()
-            
-            if success:
-                successful_downloads.append(url)
-            else:
-                failed_downloads.append((url, error_msg))
+    # One YoutubeDL per batch: extractor registration, cookie jar and option
+    # parsing are paid once and shared by every worker thread. Its request
+    # director also lives for the whole batch, so with the `requests` backend
+    # (installed by yt-dlp[default]) keep-alive connections to YouTube and
+    # googlevideo hosts are pooled and reused across videos and fragments.
+    ydl_opts = build_ydl_opts(output_path, quality, audio_only, fragments)
+    flush_warnings = getattr(urls, 'flush_warnings', None)
+    
+    # Workers hand their log records to a single listener thread instead of
+    # contending for the stdout lock and interleaving partial lines.
+    log_q = SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_q)
+    listener = logging.handlers.QueueListener(log_q, logging.StreamHandler(sys.stdout))
+    logger.addHandler(queue_handler)
+    listener.start()
+    
+    try:
+        if max_workers == 'auto':
+            byte_counter = ByteCounter()
+            ydl_opts['progress_hooks'] = [byte_counter]
+            with YoutubeDL(ydl_opts) as ydl:
+                results = asyncio.run(_autotune_and_download(urls, ydl, cache, byte_counter, fragments, flush_warnings))
+        else:
+            with YoutubeDL(ydl_opts) as ydl:
+                results = asyncio.run(_download_all(urls, ydl, max_workers, cache, flush_warnings))
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+    
+    for url, success, error_msg in results:
+        if success:
+            successful_downloads.append(url)
+        else:
+            failed_downloads.append((url, error_msg))
     
     return successful_downloads, failed_downloads
 
 
+def workers_arg(value):
+    """Parse the --workers argument: a positive integer or 'auto'."""
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid workers value: {value!r} (expected an integer or 'auto')")
+
+
 def main():
     """Main function to handle command line arguments and execute concurrent downloads."""
     
@@ -165,6 +556,7 @@ Examples:
   python youtube-scraper.py urls.txt
   python youtube-scraper.py urls.txt --output ./my_videos
   python youtube-scraper.py urls.txt --quality 720p --workers 5
+  python youtube-scraper.py urls.txt --workers auto
   python youtube-scraper.py urls.txt --audio-only
         """
     )
@@ -194,9 +586,22 @@ Examples:
     
     parser.add_argument(
         '--workers', '-w',
+        type=workers_arg,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent workers, or 'auto' to tune from measured throughput (default: {DEFAULT_WORKERS})"
+    )
+    
+    parser.add_argument(
+        '--fragments', '-f',
         type=int,
-        default=10,
-        help='Number of concurrent workers (default: 10)'
+        default=DEFAULT_FRAGMENTS,
+        help=f'Number of fragments per video to download in parallel (default: {DEFAULT_FRAGMENTS})'
+    )
+    
+    parser.add_argument(
+        '--retune',
+        action='store_true',
+        help='With --workers auto, ignore the saved worker count and measure again'
     )
     
     parser.add_argument(
@@ -205,39 +610,86 @@ Examples:
         help='List URLs from file without downloading'
     )
     
-    args = parser.parse_args()
-    urls = read_urls_from_file(args.url_file)
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Only report failed downloads and the final summary'
+    )
     
-    if not urls:
-        print("No valid YouTube URLs found in the file.")
-        sys.exit(1)
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Clear the metadata cache before running'
+    )
+    
+    parser.add_argument(
+        '--metadata-cache-size',
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f'Maximum number of videos kept in the metadata cache (default: {DEFAULT_MAX_ENTRIES})'
+    )
     
-    print(f"Found {len(urls)} valid YouTube URLs")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING if args.quiet else logging.INFO)
+    reader = UrlFileReader(args.url_file)
     
     if args.list_urls:
+        urls = list(reader)
+        if reader.error is not None:
+            reader.report_error()
+            sys.exit(1)
+        if not urls:
+            print("No valid YouTube URLs found in the file.")
+            sys.exit(1)
+        
+        print(f"Found {len(urls)} valid YouTube URLs")
+        reader.report_duplicates()
         print("\nURLs to be downloaded:")
         for i, url in enumerate(urls, 1):
             print(f"{i:2d}. {url}")
         return
     
-    if args.workers < 1 or args.workers > 20:
-        print("Warning: Workers count should be between 1 and 20. Using 10.")
-        args.workers = 10
+    if reader.peek() is None:
+        if reader.error is not None:
+            reader.report_error()
+        else:
+            print("No valid YouTube URLs found in the file.")
+        sys.exit(1)
     
-    successful_downloads, failed_downloads = download_concurrently(
-        urls=urls,
-        output_path=args.output,
-        quality=args.quality,
-        audio_only=args.audio_only,
-        max_workers=args.workers
-    )
+    if args.workers != 'auto' and (args.workers < 1 or args.workers > 20):
+        print(f"Warning: Workers count should be between 1 and 20. Using {DEFAULT_WORKERS}.")
+        args.workers = DEFAULT_WORKERS
+    
+    if args.fragments < 1:
+        print(f"Warning: Fragments count should be at least 1. Using {DEFAULT_FRAGMENTS}.")
+        args.fragments = DEFAULT_FRAGMENTS
+    
+    cache = open_cache(max_entries=args.metadata_cache_size)
+    try:
+        if args.clear_cache and cache is not None and cache.clear():
+            print("Metadata cache cleared.")
+        
+        successful_downloads, failed_downloads = download_concurrently(
+            urls=reader,
+            output_path=args.output,
+            quality=args.quality,
+            audio_only=args.audio_only,
+            max_workers=args.workers,
+            cache=cache,
+            fragments=args.fragments,
+            retune=args.retune
+        )
+    finally:
+        if cache is not None:
+            cache.close()
     
     print("\n" + "=" * 60)
     print("DOWNLOAD SUMMARY")
     print("=" * 60)
-    print(f"Total URLs processed: {len(urls)}")
+    print(f"Total URLs processed: {len(successful_downloads) + len(failed_downloads)}")
     print(f"Successful downloads: {len(successful_downloads)}")
     print(f"Failed downloads: {len(failed_downloads)}")
+    reader.report_duplicates()
     
     if failed_downloads:
         print("\nFailed downloads:")
@@ -247,7 +699,11 @@ Examples:
     if successful_downloads:
         print(f"\nAll successful downloads saved to: {args.output}")
     
-    if failed_downloads:
+    if reader.error is not None:
+        print("\nStopped early: the URL file could not be read completely.")
+        reader.report_error()
+    
+    if failed_downloads or reader.error is not None:
         sys.exit(1)
 
 
@@ -0,0 +1,39 @@
+"""
+YouTube URL Helpers
+URL checks shared by simple-youtube-scraper.py, youtube-scraper.py and the
+metadata cache.
+"""
+
+import re
+
+
+_YT_URL_RE = re.compile(r'^https://(www\.youtube\.com/|youtu\.be/|youtube\.com/)')
+
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])')
+
+
+def is_youtube_url(url):
+    """
+    Check that a URL points at a YouTube host.
+
+    Args:
+        url (str): URL to check
+
+    Returns:
+        bool: True if the URL starts with a supported YouTube host
+    """
+    return _YT_URL_RE.match(url) is not None
+
+
+def extract_video_id(url):
+    """
+    Extract the 11-character video ID from a YouTube URL.
+
+    Args:
+        url (str): YouTube video URL
+
+    Returns:
+        str: Video ID, or None if the URL does not contain one
+    """
+    match = _VIDEO_ID_RE.search(url)
+    return match.group(1) if match else None